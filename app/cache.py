@@ -0,0 +1,121 @@
+# app/cache.py
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+
+class Cache(ABC):
+    """
+    Minimal key/value cache with TTLs plus a best-effort refresh lock,
+    so only one process refreshes a given key at a time.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        ...
+
+    @abstractmethod
+    def try_lock(self, key: str, ttl_seconds: float) -> bool:
+        ...
+
+    @abstractmethod
+    def unlock(self, key: str) -> None:
+        ...
+
+
+class InMemoryCache(Cache):
+    """
+    Per-process cache. Refresh locking is a no-op here because callers already
+    coordinate threads within a process.
+    """
+
+    def __init__(self) -> None:
+        self._data: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            hit = self._data.get(key)
+        if hit is None:
+            return None
+        expires_at, value = hit
+        if time.monotonic() >= expires_at:
+            return None
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_seconds, value)
+
+    def try_lock(self, key: str, ttl_seconds: float) -> bool:
+        return True
+
+    def unlock(self, key: str) -> None:
+        pass
+
+
+# Delete the lock only if it still holds our token; it may have expired and
+# been taken by another worker in the meantime.
+_UNLOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisCache(Cache):
+    """
+    Cache shared by every worker (and surviving restarts). Values are stored
+    as JSON; the refresh lock is a SET NX PX key so one worker wins.
+    """
+
+    def __init__(self, url: str) -> None:
+        import redis  # imported lazily; only needed when REDIS_URL is set
+
+        self._redis = redis.Redis.from_url(url)
+        self._unlock = self._redis.register_script(_UNLOCK_SCRIPT)
+        self._lock_tokens: Dict[str, str] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._redis.get(key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        self._redis.setex(key, ttl_seconds, json.dumps(value))
+
+    def try_lock(self, key: str, ttl_seconds: float) -> bool:
+        token = uuid.uuid4().hex
+        acquired = self._redis.set(
+            f"{key}:lock", token, nx=True, px=int(ttl_seconds * 1000)
+        )
+        if acquired:
+            self._lock_tokens[key] = token
+        return bool(acquired)
+
+    def unlock(self, key: str) -> None:
+        token = self._lock_tokens.pop(key, None)
+        if token is None:
+            return
+        self._unlock(keys=[f"{key}:lock"], args=[token])
+
+
+def make_cache() -> Cache:
+    """
+    Pick the cache backend from env: REDIS_URL → shared Redis cache,
+    otherwise an in-process cache.
+    """
+    url = os.getenv("REDIS_URL", "").strip()
+    if url:
+        return RedisCache(url)
+    return InMemoryCache()
@@ -1,17 +1,67 @@
 # app/gam.py
+from __future__ import annotations
+
 import os
+import threading
 import time
-from typing import Dict, Any, List
-
-from googleads import ad_manager, oauth2
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+import requests
+import urllib3
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from urllib3.util.retry import Retry
+
+from .cache import Cache, make_cache
+
+if TYPE_CHECKING:
+    from googleads import ad_manager, oauth2
 
 API_VERSION = "v202411"
 SCOPE = "https://www.googleapis.com/auth/dfp"
 
+# Per-call SOAP timeout; googleads' own default is an hour.
+GAM_TIMEOUT_SECONDS = int(os.getenv("GAM_TIMEOUT_SECONDS", "60"))
+
 # Network list cache: 24 hours
 NETWORK_CACHE_TTL_SECONDS = 24 * 60 * 60  # 24 hours
-_network_cache: List[dict] | None = None
-_network_cache_ts: float | None = None
+NETWORK_CACHE_KEY = "gam:networks:v1"
+
+# How long one worker may hold the cross-worker refresh lock, and how long
+# other workers wait for it to publish before fetching themselves.
+NETWORK_REFRESH_LOCK_SECONDS = 60
+NETWORK_REFRESH_WAIT_SECONDS = 30
+
+
+class _NetworkCache:
+    """
+    Network list backed by a (possibly shared) Cache, plus the bookkeeping
+    for single-flight refreshes: while one caller is fetching, others wait on
+    the same Future instead of hitting getAllNetworks() themselves.
+
+    `value` keeps the last good list seen by this process so it can be served
+    stale if a refresh fails.
+    """
+
+    def __init__(self, store: Cache) -> None:
+        self.store = store
+        self.value: List[dict] | None = None
+        self._refresh_lock = threading.Lock()
+        self._inflight: Future | None = None
+        # Whether the in-flight refresh bypasses the cache; forced callers
+        # must not be handed the result of a non-forced one.
+        self._inflight_forced = False
+
+
+_network_cache = _NetworkCache(make_cache())
 
 
 # --- helpers to read dict-or-object safely ---
@@ -29,9 +79,16 @@ def _results(page) -> list:
     return res or []
 
 
-def _pql_where_text(field: str, value: str) -> Dict[str, Any]:
+def _pql_where_text(
+    field: str,
+    value: str,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    query = f"WHERE {field} = :val"
+    if limit is not None:
+        query = f"{query} LIMIT {int(limit)}"
     return {
-        "query": f"WHERE {field} = :val",
+        "query": query,
         "values": [
             {
                 "key": "val",
@@ -42,15 +99,60 @@ def _pql_where_text(field: str, value: str) -> Dict[str, Any]:
 
 
 # --- client builders ---
+_googleads = None
+
+
+def _lazy_ga():
+    """
+    Import googleads on first use. It pulls in zeep + lxml and is by far the
+    slowest import in the app, which /healthz-only cold starts don't need.
+    """
+    global _googleads
+    if _googleads is None:
+        import googleads.ad_manager
+        import googleads.errors
+        import googleads.oauth2
+
+        _googleads = googleads
+    return _googleads
+
+
+def _client_settings() -> Tuple[str, str]:
+    key_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS", "./sa.json")
+    app_name = os.environ.get("APP_NAME", "GAM Access API")
+    return key_path, app_name
+
+
+@lru_cache(maxsize=None)
+def _oauth2_client(key_path: str, scope: str) -> oauth2.GoogleServiceAccountClient:
+    # Reading + parsing the service-account key is only needed once per process;
+    # the client refreshes its own access token when it expires.
+    return _lazy_ga().oauth2.GoogleServiceAccountClient(key_path, scope)
+
+
+@lru_cache(maxsize=None)
+def _client_for(
+    network_code: Optional[str],
+    key_path: str,
+    app_name: str,
+) -> ad_manager.AdManagerClient:
+    ad_manager = _lazy_ga().ad_manager
+    oauth2_client = _oauth2_client(key_path, SCOPE)
+    return ad_manager.AdManagerClient(
+        oauth2_client,
+        app_name,
+        network_code,
+        timeout=GAM_TIMEOUT_SECONDS,
+    )
+
+
 def build_client(network_code: str) -> ad_manager.AdManagerClient:
     """
     Build an AdManagerClient scoped to a specific network.
     Assumes the service account is a user in that network with API access.
+    Clients are cached per network for the life of the process.
     """
-    key_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS", "./sa.json")
-    app_name = os.environ.get("APP_NAME", "GAM Access API")
-    oauth2_client = oauth2.GoogleServiceAccountClient(key_path, SCOPE)
-    return ad_manager.AdManagerClient(oauth2_client, app_name, network_code)
+    return _client_for(network_code, *_client_settings())
 
 
 def build_client_no_network() -> ad_manager.AdManagerClient:
@@ -58,19 +160,192 @@ def build_client_no_network() -> ad_manager.AdManagerClient:
     Build an AdManagerClient not tied to any single network.
     Used to list all accessible networks.
     """
-    key_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS", "./sa.json")
-    app_name = os.environ.get("APP_NAME", "GAM Access API")
-    oauth2_client = oauth2.GoogleServiceAccountClient(key_path, SCOPE)
-    return ad_manager.AdManagerClient(oauth2_client, app_name)
+    return _client_for(None, *_client_settings())
 
 
-# --- role + user helpers ---
-def get_admin_role_id(client: ad_manager.AdManagerClient) -> int:
+# One keep-alive connection pool shared by every zeep transport, so SOAP calls
+# reuse warm TLS connections to ads.google.com across services and networks.
+# The adapter only retries failed connects (the request never left); status
+# and other transient errors are retried by _soap_call, which leaves connect
+# failures alone so the two layers don't multiply.
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(connect=3, read=0, status=0, other=0, backoff_factor=0.2),
+)
+
+
+# Service proxies are expensive to build (WSDL binding parse), so keep one per
+# (client, service). The client is stored alongside so its id() can't be reused.
+_service_cache: Dict[Tuple[int, str], Tuple[ad_manager.AdManagerClient, Any]] = {}
+_service_cache_lock = threading.Lock()
+
+
+def _get_service(client: ad_manager.AdManagerClient, service_name: str):
+    key = (id(client), service_name)
+    with _service_cache_lock:
+        hit = _service_cache.get(key)
+    if hit is not None:
+        return hit[1]
+
+    service = client.GetService(service_name, version=API_VERSION)
+    # googleads builds its own zeep Transport/Session per service; point its
+    # HTTPS traffic at the shared pool.
+    service.zeep_client.transport.session.mount("https://", _HTTP_ADAPTER)
+    with _service_cache_lock:
+        _service_cache.setdefault(key, (client, service))
+        return _service_cache[key][1]
+
+
+# --- rate limiting + retries around SOAP calls ---
+class _TokenBucket:
     """
-    Fetch the 'Administrator' roleId using UserService.getAllRoles().
+    Thread-safe token bucket: allows `rate` calls per second on average,
+    with bursts of up to `rate` calls (at least one, so rates below 1 work).
+    """
+
+    def __init__(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self._rate = rate
+        self._capacity = max(1.0, rate)
+        self._tokens = self._capacity
+        self._ts = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._ts) * self._rate
+                )
+                self._ts = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+# GAM rate limits are per network, so each network gets its own bucket.
+# Buckets live in-process: with N workers a network can see N * GAM_QPS.
+GAM_QPS = float(os.getenv("GAM_QPS", "8"))
+if GAM_QPS <= 0:
+    raise RuntimeError(f"GAM_QPS must be greater than 0, got {GAM_QPS}.")
+_rate_limiters: Dict[str, _TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def _rate_limiter(client: ad_manager.AdManagerClient) -> _TokenBucket:
+    network_code = str(client.network_code)
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(network_code)
+        if limiter is None:
+            limiter = _rate_limiters[network_code] = _TokenBucket(GAM_QPS)
+        return limiter
+
+
+# Fault reasons that mean "slow down / try again", not "your request is wrong".
+# Quota faults are raised before GAM does any work, so they are the only ones
+# safe to retry for writes.
+_QUOTA_FAULT_MARKERS = (
+    "EXCEEDED_QUOTA",
+    "RESOURCE_EXHAUSTED",
+    "SERVER_BUSY",
+)
+_RETRYABLE_FAULT_MARKERS = _QUOTA_FAULT_MARKERS + (
+    "SERVER_ERROR",
+    "UNEXPECTED_INTERNAL_API_ERROR",
+    "INTERNAL_ERROR",
+)
+_RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _fault_has(exc: BaseException, markers: Tuple[str, ...]) -> bool:
+    if not isinstance(exc, _lazy_ga().errors.GoogleAdsServerFault):
+        return False
+    text = f"{exc} {exc.errors}"
+    return any(marker in text for marker in markers)
+
+
+def _is_connect_failure(exc: BaseException) -> bool:
+    # The request never reached GAM; _HTTP_ADAPTER has already retried these.
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError) and exc.args:
+        reason = getattr(exc.args[0], "reason", None)
+        return isinstance(reason, urllib3.exceptions.NewConnectionError)
+    return False
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    # googleads (and so zeep) is already loaded by the time a SOAP call fails.
+    from zeep.exceptions import TransportError
+
+    if _fault_has(exc, _RETRYABLE_FAULT_MARKERS):
+        return True
+    if isinstance(exc, TransportError):
+        return exc.status_code in _RETRYABLE_HTTP_STATUSES
+    if _is_connect_failure(exc):
+        return False
+    return isinstance(
+        exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    )
+
+
+def _is_retryable_write(exc: BaseException) -> bool:
+    # A timeout or server error may come after the write was applied, so only
+    # retry rejections that guarantee nothing happened.
+    from zeep.exceptions import TransportError
+
+    if _fault_has(exc, _QUOTA_FAULT_MARKERS):
+        return True
+    return isinstance(exc, TransportError) and exc.status_code == 429
+
+
+def _call_limited(client: ad_manager.AdManagerClient, method, *args):
+    _rate_limiter(client).acquire()
+    return method(*args)
+
+
+@retry(
+    stop=stop_after_attempt(4),
+    wait=wait_random_exponential(multiplier=0.25, max=8),
+    retry=retry_if_exception(_is_retryable),
+    reraise=True,
+)
+def _soap_call(client: ad_manager.AdManagerClient, method, *args):
+    """
+    Call a read-only SOAP method under the network's rate limit, retrying quota
+    and transient server/transport errors with jittered exponential backoff.
     """
-    user_service = client.GetService("UserService", version=API_VERSION)
-    roles = user_service.getAllRoles() or []
+    return _call_limited(client, method, *args)
+
+
+@retry(
+    stop=stop_after_attempt(4),
+    wait=wait_random_exponential(multiplier=0.25, max=8),
+    retry=retry_if_exception(_is_retryable_write),
+    reraise=True,
+)
+def _soap_write(client: ad_manager.AdManagerClient, method, *args):
+    """
+    Like _soap_call, for non-idempotent methods: only quota rejections are
+    retried, so a create/update is never sent twice.
+    """
+    return _call_limited(client, method, *args)
+
+
+# --- role + user helpers ---
+# The Administrator roleId is fixed per network, so look it up once.
+_admin_role_cache: Dict[str, int] = {}
+_admin_role_cache_lock = threading.Lock()
+
+
+def _fetch_admin_role_id(client: ad_manager.AdManagerClient) -> int:
+    user_service = _get_service(client, "UserService")
+    roles = _soap_call(client, user_service.getAllRoles) or []
     for r in roles:
         if _get(r, "name") == "Administrator":
             rid = _get(r, "id")
@@ -80,11 +355,60 @@ def get_admin_role_id(client: ad_manager.AdManagerClient) -> int:
     raise RuntimeError("Administrator role not found in this network.")
 
 
+def get_admin_role_id(client: ad_manager.AdManagerClient) -> int:
+    """
+    Fetch the 'Administrator' roleId using UserService.getAllRoles().
+    Cached per network code after the first successful lookup.
+    """
+    network_code = str(client.network_code)
+    with _admin_role_cache_lock:
+        rid = _admin_role_cache.get(network_code)
+    if rid is not None:
+        return rid
+
+    rid = _fetch_admin_role_id(client)
+    with _admin_role_cache_lock:
+        _admin_role_cache[network_code] = rid
+    return rid
+
+
+# Recently seen users per (network, email), so a repeated /grant-access for the
+# same person skips the lookup. Entries are refreshed after create/update.
+USER_CACHE_TTL_SECONDS = 60
+_user_cache: TTLCache = TTLCache(maxsize=4096, ttl=USER_CACHE_TTL_SECONDS)
+_user_cache_lock = threading.Lock()
+
+
+def _user_cache_key(
+    client: ad_manager.AdManagerClient,
+    email: str,
+) -> Tuple[str, str]:
+    return str(client.network_code), email.strip().lower()
+
+
+def _remember_user(client: ad_manager.AdManagerClient, email: str, user) -> None:
+    with _user_cache_lock:
+        _user_cache[_user_cache_key(client, email)] = user
+
+
 def find_user_by_email(client: ad_manager.AdManagerClient, email: str):
-    user_service = client.GetService("UserService", version=API_VERSION)
-    page = user_service.getUsersByStatement(_pql_where_text("email", email))
+    key = _user_cache_key(client, email)
+    with _user_cache_lock:
+        user = _user_cache.get(key)
+    if user is not None:
+        return user
+
+    user_service = _get_service(client, "UserService")
+    page = _soap_call(
+        client,
+        user_service.getUsersByStatement,
+        _pql_where_text("email", key[1], limit=1),
+    )
     users = _results(page)
-    return users[0] if users else None
+    if not users:
+        return None
+    _remember_user(client, email, users[0])
+    return users[0]
 
 
 def create_user_as_admin(
@@ -92,8 +416,10 @@ def create_user_as_admin(
     email: str,
     role_id: int,
 ):
-    user_service = client.GetService("UserService", version=API_VERSION)
-    created = user_service.createUsers(
+    user_service = _get_service(client, "UserService")
+    created = _soap_write(
+        client,
+        user_service.createUsers,
         [
             {
                 "name": email.split("@")[0],  # simple default display name
@@ -101,7 +427,7 @@ def create_user_as_admin(
                 "roleId": role_id,
                 "isActive": True,
             }
-        ]
+        ],
     ) or []
     return created[0]
 
@@ -111,14 +437,16 @@ def update_user_role(
     user_id: int,
     role_id: int,
 ):
-    user_service = client.GetService("UserService", version=API_VERSION)
-    updated = user_service.updateUsers(
+    user_service = _get_service(client, "UserService")
+    updated = _soap_write(
+        client,
+        user_service.updateUsers,
         [
             {
                 "id": user_id,
                 "roleId": role_id,
             }
-        ]
+        ],
     ) or []
     return updated[0]
 
@@ -137,12 +465,23 @@ def grant_admin_for_email(
     existing = find_user_by_email(client, email)
 
     if not existing:
-        created = create_user_as_admin(client, email, admin_role_id)
-        return {
-            "status": "created",
-            "userId": int(_get(created, "id")),
-            "roleId": admin_role_id,
-        }
+        try:
+            created = create_user_as_admin(client, email, admin_role_id)
+        except Exception as exc:
+            # A concurrent grant (or a create whose response we lost) already
+            # added this user; carry on with the existing record.
+            if not _fault_has(exc, ("NOT_UNIQUE",)):
+                raise
+            existing = find_user_by_email(client, email)
+            if not existing:
+                raise
+        else:
+            _remember_user(client, email, created)
+            return {
+                "status": "created",
+                "userId": int(_get(created, "id")),
+                "roleId": admin_role_id,
+            }
 
     current_role = _get(existing, "roleId")
     if int(current_role) != admin_role_id:
@@ -151,6 +490,7 @@ def grant_admin_for_email(
             int(_get(existing, "id")),
             admin_role_id,
         )
+        _remember_user(client, email, updated)
         return {
             "status": "upgraded",
             "userId": int(_get(updated, "id")),
@@ -171,8 +511,8 @@ def _fetch_networks_from_api() -> List[dict]:
     to list[{"networkCode", "displayName"}].
     """
     client = build_client_no_network()
-    svc = client.GetService("NetworkService", version=API_VERSION)
-    networks = svc.getAllNetworks() or []
+    svc = _get_service(client, "NetworkService")
+    networks = _soap_call(client, svc.getAllNetworks) or []
 
     result: List[dict] = []
     for n in networks:
@@ -193,26 +533,106 @@ def _fetch_networks_from_api() -> List[dict]:
     return result
 
 
+def _store_get(store: Cache) -> Optional[List[dict]]:
+    """Read the shared list; an unreachable store counts as a miss."""
+    try:
+        return store.get(NETWORK_CACHE_KEY)
+    except Exception:
+        return None
+
+
+def _fetch_and_publish(store: Cache) -> List[dict]:
+    networks = _fetch_networks_from_api()
+    try:
+        store.set(NETWORK_CACHE_KEY, networks, NETWORK_CACHE_TTL_SECONDS)
+    except Exception:
+        # The fetch succeeded; a store outage shouldn't throw it away.
+        pass
+    return networks
+
+
+def _refresh_networks(store: Cache) -> List[dict]:
+    """
+    Fetch from GAM and publish to the store. Across workers only the holder
+    of the store's refresh lock fetches; the rest wait for it to publish, or
+    take over as soon as the lock is released without a result.
+    """
+    deadline = time.monotonic() + NETWORK_REFRESH_WAIT_SECONDS
+    while not store.try_lock(NETWORK_CACHE_KEY, NETWORK_REFRESH_LOCK_SECONDS):
+        if time.monotonic() >= deadline:
+            # Lock holder is stuck; fetch without the lock.
+            return _fetch_and_publish(store)
+        time.sleep(0.2)
+        networks = _store_get(store)
+        if networks is not None:
+            return networks
+
+    try:
+        return _fetch_and_publish(store)
+    finally:
+        try:
+            store.unlock(NETWORK_CACHE_KEY)
+        except Exception:
+            pass  # the lock expires on its own
+
+
 def list_accessible_networks_cached(force_refresh: bool = False) -> List[dict]:
     """
     Return cached networks if still fresh, otherwise call API and refresh cache.
+    Concurrent callers share a single in-flight refresh. If the refresh fails
+    and a stale list is available, the stale list is served instead.
 
     force_refresh=True bypasses TTL and forces a fresh call to GAM.
     """
-    global _network_cache, _network_cache_ts
-
-    now = time.time()
-    if (
-        not force_refresh
-        and _network_cache is not None
-        and _network_cache_ts is not None
-        and now - _network_cache_ts < NETWORK_CACHE_TTL_SECONDS
-    ):
-        return _network_cache
-
-    networks = _fetch_networks_from_api()
-    _network_cache = networks
-    _network_cache_ts = now
+    cache = _network_cache
+
+    if not force_refresh:
+        networks = _store_get(cache.store)
+        if networks is not None:
+            cache.value = networks
+            return networks
+
+    while True:
+        with cache._refresh_lock:
+            inflight = cache._inflight
+            if inflight is None:
+                inflight = cache._inflight = Future()
+                cache._inflight_forced = force_refresh
+                leader = True
+            else:
+                leader = False
+                joinable = cache._inflight_forced or not force_refresh
+
+        if leader:
+            break
+        if joinable:
+            return inflight.result()
+        # A forced refresh can't reuse a non-forced one (it may just return
+        # the cached list); wait for it to finish, then start our own.
+        try:
+            inflight.result()
+        except Exception:
+            pass
+
+    try:
+        # Another caller may have refreshed between our miss and taking the lead.
+        networks = None if force_refresh else _store_get(cache.store)
+        if networks is None:
+            networks = _refresh_networks(cache.store)
+    except Exception as e:
+        with cache._refresh_lock:
+            cache._inflight = None
+        stale = cache.value
+        if stale is not None:
+            inflight.set_result(stale)
+            return stale
+        inflight.set_exception(e)
+        raise
+
+    with cache._refresh_lock:
+        cache.value = networks
+        cache._inflight = None
+    inflight.set_result(networks)
     return networks
 
 
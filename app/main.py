@@ -1,19 +1,104 @@
 # app/main.py
+import asyncio
 import os
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
 from datetime import date, timedelta
-from enum import Enum
-from typing import List, Optional
+from functools import wraps
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+import orjson
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, RedirectResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr, Field
-from googleads import errors as googleads_errors
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from .gam import build_client, grant_admin_for_email
+from .gam import build_client, get_admin_role_id, grant_admin_for_email
 from .gam import list_accessible_networks
+from .reporting_schemas import (
+    DateRange,
+    LocationBreakdownItemDict,
+    LocationResponse,
+    SummaryMetrics,
+    SummaryResponse,
+    TimeseriesPointDict,
+    TimeseriesResponse,
+    resolve_date_range,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Upper bound on startup warmup; past this the caches just fill on first use.
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "15"))
+
+# Warmup gets its own two threads. Timing out only abandons the awaits; the
+# blocking GAM calls run to completion, and they must not hold grant threads.
+_WARMUP_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gam-warmup")
+
+
+async def _warmup() -> None:
+    """
+    Prime the network list and the Administrator roleId for each GAM_NETWORKS
+    network, so the first real request on a fresh worker is already fast.
+    Failures are ignored; those caches just fill on first use instead.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(_WARMUP_EXECUTOR, list_accessible_networks)
+    except Exception:
+        pass
+
+    await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                _WARMUP_EXECUTOR,
+                lambda c=code: get_admin_role_id(build_client(c)),
+            )
+            for code in _env_networks()
+        ),
+        return_exceptions=True,
+    )
 
 
-app = FastAPI(title="GAM Access API", version="1.0.0")
+async def _warmup_in_background() -> None:
+    try:
+        await asyncio.wait_for(_warmup(), timeout=WARMUP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # Warmup loads googleads; without GAM_NETWORKS there is nothing to prime,
+    # so leave the SOAP stack for the first request that needs it.
+    if not _env_networks():
+        yield
+        return
+
+    # Don't hold up serving (/healthz in particular) on GAM being reachable.
+    warmup = asyncio.create_task(_warmup_in_background())
+    yield
+    warmup.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup
+    # Drop role lookups still queued; ones already talking to GAM finish alone.
+    _WARMUP_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(
+    title="GAM Access API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=_lifespan,
+)
 
 # =========================
 # CORS CONFIG
@@ -38,6 +123,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Report payloads (timeseries especially) repeat the same keys on every row
+# and compress well; small responses aren't worth the CPU. Level 6 gets most
+# of level 9's ratio for much less CPU. Streaming NDJSON compresses itself
+# (see _gzip_stream) and the middleware passes it through.
+GZIP_COMPRESSLEVEL = 6
+app.add_middleware(
+    GZipMiddleware, minimum_size=1024, compresslevel=GZIP_COMPRESSLEVEL
+)
+
+
+_HEALTHZ_RESPONSE = Response(b'{"ok":true}', media_type="application/json")
+
+
+class _HealthzFastPath:
+    """
+    Raw ASGI middleware answering GET/HEAD /healthz before CORS, gzip, routing
+    or response serialization run. LB / Render probes hit this constantly.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["path"] == "/healthz"
+            and scope["method"] in ("GET", "HEAD")
+        ):
+            await _HEALTHZ_RESPONSE(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+# Added last so it wraps (and short-circuits) every other middleware.
+app.add_middleware(_HealthzFastPath)
+
 
 # =========================
 # Existing access endpoints
@@ -69,13 +190,40 @@ def _env_networks() -> List[str]:
     return [n.strip() for n in raw.split(",") if n.strip()]
 
 
-@app.get("/healthz")
-def healthz():
-    return {"ok": True}
+# googleads/zeep are synchronous, so per-network grants run on a small pool of
+# their own. Its size caps concurrent GAM calls (so a large /grant-access
+# fan-out doesn't trip Google's customer-level rate limits) and the number of
+# threads doing SOAP I/O, without touching the default executor.
+_GRANT_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GAM_MAX_CONCURRENCY", "8")),
+    thread_name_prefix="gam-grant",
+)
+
+
+def _grant_one(code: str, email: str) -> GrantResult:
+    """
+    Blocking: build the client for one network and grant admin there.
+    Errors are folded into the result so one bad network doesn't fail the rest.
+    """
+    from googleads import errors as googleads_errors
+
+    try:
+        client = build_client(network_code=code)
+        out = grant_admin_for_email(client, email)
+        return GrantResult(network=code, **out)
+    except googleads_errors.GoogleAdsServerFault as e:
+        return GrantResult(network=code, status="error", error=str(e))
+    except Exception as e:
+        return GrantResult(network=code, status="error", error=str(e))
+
+
+async def _grant_one_async(code: str, email: str) -> GrantResult:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_GRANT_EXECUTOR, _grant_one, code, email)
 
 
 @app.post("/grant-access", response_model=GrantResponse)
-def grant_access(body: GrantRequest):
+async def grant_access(body: GrantRequest):
     networks = body.networks or _env_networks()
     if not networks:
         raise HTTPException(
@@ -83,21 +231,11 @@ def grant_access(body: GrantRequest):
             detail="No networks provided and GAM_NETWORKS env not set.",
         )
 
-    results: List[GrantResult] = []
-
-    for code in networks:
-        try:
-            client = build_client(network_code=code)
-            out = grant_admin_for_email(client, body.email)
-            results.append(GrantResult(network=code, **out))
-        except googleads_errors.GoogleAdsServerFault as e:
-            results.append(
-                GrantResult(network=code, status="error", error=str(e))
-            )
-        except Exception as e:
-            results.append(
-                GrantResult(network=code, status="error", error=str(e))
-            )
+    # Networks are independent, so run them concurrently; gather keeps
+    # results in the same order as the requested networks.
+    results: List[GrantResult] = await asyncio.gather(
+        *(_grant_one_async(code, body.email) for code in networks)
+    )
 
     return GrantResponse(email=body.email, results=results)
 
@@ -110,98 +248,88 @@ def get_networks():
         return {"error": str(e)}
 
 
-# =========================
-# Reporting models
-# =========================
-
-class DateRange(str, Enum):
-    today = "today"
-    yesterday = "yesterday"
-    last_7_days = "last_7_days"
-    last_30_days = "last_30_days"
-    custom = "custom"
-
-
-def resolve_date_range(
-    range_: DateRange,
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-) -> tuple[date, date]:
-    today = date.today()
-
-    if range_ == DateRange.today:
-        return today, today
-    if range_ == DateRange.yesterday:
-        y = today - timedelta(days=1)
-        return y, y
-    if range_ == DateRange.last_7_days:
-        return today - timedelta(days=6), today
-    if range_ == DateRange.last_30_days:
-        return today - timedelta(days(29)), today  # <- BUG: fix below
-
-    # custom
-    if not start_date or not end_date:
-        raise ValueError("start_date and end_date are required for custom range")
-    if start_date > end_date:
-        raise ValueError("start_date cannot be after end_date")
-    return start_date, end_date
-
-
-class SummaryMetrics(BaseModel):
-    impressions: int = 0
-    clicks: int = 0
-    ctr: float = 0.0        # percent, for example 1.23
-    revenue: float = 0.0    # default currency
-    ecpm: float = 0.0       # revenue per 1000 impressions
-
-
-class LocationBreakdownItem(BaseModel):
-    country: str
-    region: Optional[str] = None
-    impressions: int
-    clicks: int
-    ctr: float
-    revenue: float
-    ecpm: float
-
-
-class TimeseriesPoint(BaseModel):
-    date: date
-    impressions: int
-    clicks: int
-    ctr: float
-    revenue: float
-    ecpm: float
-
-
-class SummaryResponse(BaseModel):
-    range: DateRange
-    start_date: date
-    end_date: date
-    network_code: Optional[str] = None
-    metrics: SummaryMetrics
-
-
-class LocationResponse(BaseModel):
-    range: DateRange
-    start_date: date
-    end_date: date
-    network_code: Optional[str] = None
-    locations: List[LocationBreakdownItem]
-
-
-class TimeseriesResponse(BaseModel):
-    range: DateRange
-    start_date: date
-    end_date: date
-    network_code: Optional[str] = None
-    points: List[TimeseriesPoint]
-
-
 # =========================
 # Reporting data functions
 # =========================
 
+# Reports are memoized per (kind, network, start, end). Ranges that include
+# today are still changing, so they get a much shorter TTL. On a miss, identical
+# concurrent calls share one in-flight Future instead of each running the report.
+_report_cache: TTLCache = TTLCache(
+    maxsize=1024, ttl=int(os.getenv("REPORT_TTL", "900"))
+)
+_report_cache_today: TTLCache = TTLCache(maxsize=256, ttl=60)
+_report_inflight: Dict[tuple, Future] = {}
+_report_lock = threading.Lock()
+
+
+def _report_cached(kind: str):
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(
+            start_date: date,
+            end_date: date,
+            network_code: Optional[str] = None,
+        ):
+            cache = (
+                _report_cache_today if end_date >= date.today() else _report_cache
+            )
+            key = hashkey(
+                kind, network_code, start_date.toordinal(), end_date.toordinal()
+            )
+            with _report_lock:
+                hit = cache.get(key)
+                if hit is not None:
+                    return hit
+                inflight = _report_inflight.get(key)
+                if inflight is None:
+                    inflight = _report_inflight[key] = Future()
+                    leader = True
+                else:
+                    leader = False
+
+            if not leader:
+                return inflight.result()
+
+            try:
+                value = fn(start_date, end_date, network_code)
+            except BaseException as e:
+                with _report_lock:
+                    _report_inflight.pop(key, None)
+                inflight.set_exception(e)
+                raise
+
+            with _report_lock:
+                cache[key] = value
+                _report_inflight.pop(key, None)
+            inflight.set_result(value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def _rate(num: float, den: float, scale: float, ndigits: int) -> float:
+    """num / den * scale, rounded; 0.0 when den is zero (ctr, ecpm)."""
+    return round(num / den * scale, ndigits) if den else 0.0
+
+
+def _rate_array(
+    num: "np.ndarray",
+    den: "np.ndarray",
+    scale: float,
+    ndigits: int,
+) -> "np.ndarray":
+    """Vectorized _rate: rows with a zero denominator come out as 0.0."""
+    import numpy as np
+
+    out = np.zeros(len(den), dtype=np.float64)
+    np.divide(num, den, out=out, where=den != 0)
+    return np.round(out * scale, ndigits)
+
+
+@_report_cached("summary")
 def fetch_summary_metrics(
     start_date: date,
     end_date: date,
@@ -220,27 +348,25 @@ def fetch_summary_metrics(
     clicks = 1_200
     revenue = 250.0
 
-    ctr = (clicks / impressions * 100) if impressions else 0.0
-    ecpm = (revenue / impressions * 1000) if impressions else 0.0
-
-    return SummaryMetrics(
+    return SummaryMetrics.model_construct(
         impressions=impressions,
         clicks=clicks,
-        ctr=round(ctr, 3),
+        ctr=_rate(clicks, impressions, 100.0, 3),
         revenue=round(revenue, 2),
-        ecpm=round(ecpm, 3),
+        ecpm=_rate(revenue, impressions, 1000.0, 3),
     )
 
 
+@_report_cached("locations")
 def fetch_location_breakdown(
     start_date: date,
     end_date: date,
     network_code: Optional[str] = None,
-) -> List[LocationBreakdownItem]:
+) -> List[LocationBreakdownItemDict]:
     """
     TODO: Replace with real GAM query grouped by country / region.
     """
-    items: List[LocationBreakdownItem] = []
+    items: List[LocationBreakdownItemDict] = []
 
     # Example data
     us_impressions = 40_000
@@ -252,72 +378,117 @@ def fetch_location_breakdown(
     pk_revenue = 60.0
 
     items.append(
-        LocationBreakdownItem(
-            country="US",
-            region=None,
-            impressions=us_impressions,
-            clicks=us_clicks,
-            ctr=round(us_clicks / us_impressions * 100, 3)
-            if us_impressions
-            else 0.0,
-            revenue=round(us_revenue, 2),
-            ecpm=round(us_revenue / us_impressions * 1000, 3)
-            if us_impressions
-            else 0.0,
-        )
+        {
+            "country": "US",
+            "region": None,
+            "impressions": us_impressions,
+            "clicks": us_clicks,
+            "ctr": _rate(us_clicks, us_impressions, 100.0, 3),
+            "revenue": round(us_revenue, 2),
+            "ecpm": _rate(us_revenue, us_impressions, 1000.0, 3),
+        }
     )
 
     items.append(
-        LocationBreakdownItem(
-            country="PK",
-            region=None,
-            impressions=pk_impressions,
-            clicks=pk_clicks,
-            ctr=round(pk_clicks / pk_impressions * 100, 3)
-            if pk_impressions
-            else 0.0,
-            revenue=round(pk_revenue, 2),
-            ecpm=round(pk_revenue / pk_impressions * 1000, 3)
-            if pk_impressions
-            else 0.0,
-        )
+        {
+            "country": "PK",
+            "region": None,
+            "impressions": pk_impressions,
+            "clicks": pk_clicks,
+            "ctr": _rate(pk_clicks, pk_impressions, 100.0, 3),
+            "revenue": round(pk_revenue, 2),
+            "ecpm": _rate(pk_revenue, pk_impressions, 1000.0, 3),
+        }
     )
 
     return items
 
 
+def _timeseries_rows(
+    start_date: date,
+    end_date: date,
+) -> Iterator[TimeseriesPointDict]:
+    """
+    Yield one point per day. Shared by the JSON and NDJSON timeseries endpoints.
+    """
+    # Imported lazily, like googleads, to keep worker cold starts cheap.
+    import numpy as np
+
+    days = (end_date - start_date).days + 1
+
+    i = np.arange(days, dtype=np.int64)
+    impressions = 5_000 + i * 200
+    clicks = 50 + i * 3
+    revenue = 10 + i * 0.5
+
+    ctr = _rate_array(clicks, impressions, 100.0, 3)
+    ecpm = _rate_array(revenue, impressions, 1000.0, 3)
+    revenue = np.round(revenue, 2)
+
+    for offset, imp, clk, c, rev, e in zip(
+        i.tolist(),
+        impressions.tolist(),
+        clicks.tolist(),
+        ctr.tolist(),
+        revenue.tolist(),
+        ecpm.tolist(),
+    ):
+        yield {
+            "date": start_date + timedelta(days=offset),
+            "impressions": imp,
+            "clicks": clk,
+            "ctr": c,
+            "revenue": rev,
+            "ecpm": e,
+        }
+
+
+@_report_cached("timeseries")
 def fetch_timeseries(
     start_date: date,
     end_date: date,
     network_code: Optional[str] = None,
-) -> List[TimeseriesPoint]:
+) -> List[TimeseriesPointDict]:
     """
     TODO: Replace with real GAM daily timeseries query.
     """
-    days = (end_date - start_date).days + 1
-    points: List[TimeseriesPoint] = []
-
-    for i in range(days):
-        current = start_date + timedelta(days=i)
-        impressions = 5_000 + i * 200
-        clicks = 50 + i * 3
-        revenue = 10 + i * 0.5
-
-        ctr = (clicks / impressions * 100) if impressions else 0.0
-        ecpm = (revenue / impressions * 1000) if impressions else 0.0
-
-        points.append(
-            TimeseriesPoint(
-                date=current,
-                impressions=impressions,
-                clicks=clicks,
-                ctr=round(ctr, 3),
-                revenue=round(revenue, 2),
-                ecpm=round(ecpm, 3),
-            )
-        )
+    return list(_timeseries_rows(start_date, end_date))
+
 
-    return points
+# Rows per NDJSON chunk.
+NDJSON_BATCH_ROWS = 256
+
+
+def iter_timeseries_ndjson(
+    start_date: date,
+    end_date: date,
+    network_code: Optional[str] = None,
+) -> Iterator[bytes]:
+    """
+    Stream the daily timeseries as NDJSON, one point per line, without
+    building the full list of points. Lines are sent in batches: Starlette
+    iterates sync generators on the threadpool, one hop per chunk.
+    """
+    batch: List[bytes] = []
+    for point in _timeseries_rows(start_date, end_date):
+        batch.append(orjson.dumps(point))
+        if len(batch) >= NDJSON_BATCH_ROWS:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+def _gzip_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Gzip a stream chunk by chunk. GZipMiddleware would compress it too, but
+    zlib holds its output until the stream ends; a sync flush after each chunk
+    lets clients decode rows as they arrive.
+    """
+    z = zlib.compressobj(GZIP_COMPRESSLEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield z.compress(chunk) + z.flush(zlib.Z_SYNC_FLUSH)
+    yield z.flush()
 
 
 def _resolve_dates_or_400(
@@ -331,12 +502,33 @@ def _resolve_dates_or_400(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# Dedicated pool for blocking report fetches, so slow GAM report jobs can't
+# starve the default threadpool used by the rest of the app.
+_REPORT_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("REPORT_WORKERS", "8")),
+    thread_name_prefix="gam-report",
+)
+
+
+async def _run_report(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_REPORT_EXECUTOR, fn, *args)
+
+
 # =========================
 # Reporting endpoints
 # =========================
 
+# Lets a CDN / browser reuse report responses briefly.
+_REPORT_CACHE_CONTROL = "public, max-age=60"
+
+# Longer timeseries ranges are served as NDJSON instead of one JSON document.
+TIMESERIES_STREAM_THRESHOLD_DAYS = 90
+
+
 @app.get("/reports/summary", response_model=SummaryResponse)
-def get_summary_report(
+async def get_summary_report(
+    response: Response,
     range: DateRange = Query(default=DateRange.today),
     start_date: Optional[date] = Query(default=None),
     end_date: Optional[date] = Query(default=None),
@@ -347,7 +539,8 @@ def get_summary_report(
     for the given date range and optional network.
     """
     start, end = _resolve_dates_or_400(range, start_date, end_date)
-    metrics = fetch_summary_metrics(start, end, network_code)
+    response.headers["Cache-Control"] = _REPORT_CACHE_CONTROL
+    metrics = await _run_report(fetch_summary_metrics, start, end, network_code)
 
     return SummaryResponse(
         range=range,
@@ -358,8 +551,12 @@ def get_summary_report(
     )
 
 
-@app.get("/reports/locations", response_model=LocationResponse)
-def get_location_report(
+@app.get(
+    "/reports/locations",
+    response_model=None,
+    responses={200: {"model": LocationResponse}},
+)
+async def get_location_report(
     range: DateRange = Query(default=DateRange.today),
     start_date: Optional[date] = Query(default=None),
     end_date: Optional[date] = Query(default=None),
@@ -369,19 +566,28 @@ def get_location_report(
     Breakdown by country / region with revenue, ecpm, ctr.
     """
     start, end = _resolve_dates_or_400(range, start_date, end_date)
-    locations = fetch_location_breakdown(start, end, network_code)
-
-    return LocationResponse(
-        range=range,
-        start_date=start,
-        end_date=end,
-        network_code=network_code,
-        locations=locations,
+    locations = await _run_report(fetch_location_breakdown, start, end, network_code)
+
+    # Rows are trusted dicts; hand them straight to orjson.
+    return ORJSONResponse(
+        {
+            "range": range,
+            "start_date": start,
+            "end_date": end,
+            "network_code": network_code,
+            "locations": locations,
+        },
+        headers={"Cache-Control": _REPORT_CACHE_CONTROL},
     )
 
 
-@app.get("/reports/timeseries", response_model=TimeseriesResponse)
-def get_timeseries_report(
+@app.get(
+    "/reports/timeseries",
+    response_model=None,
+    responses={200: {"model": TimeseriesResponse}},
+)
+async def get_timeseries_report(
+    request: Request,
     range: DateRange = Query(default=DateRange.last_7_days),
     start_date: Optional[date] = Query(default=None),
     end_date: Optional[date] = Query(default=None),
@@ -389,14 +595,50 @@ def get_timeseries_report(
 ):
     """
     Daily timeseries for charts: revenue, ecpm, ctr, etc.
+    Ranges longer than TIMESERIES_STREAM_THRESHOLD_DAYS redirect to the
+    NDJSON endpoint.
     """
     start, end = _resolve_dates_or_400(range, start_date, end_date)
-    points = fetch_timeseries(start, end, network_code)
+    if (end - start).days + 1 > TIMESERIES_STREAM_THRESHOLD_DAYS:
+        url = request.url_for("get_timeseries_ndjson").replace(
+            query=request.url.query
+        )
+        return RedirectResponse(str(url), status_code=307)
+
+    points = await _run_report(fetch_timeseries, start, end, network_code)
+
+    # Rows are trusted dicts; hand them straight to orjson.
+    return ORJSONResponse(
+        {
+            "range": range,
+            "start_date": start,
+            "end_date": end,
+            "network_code": network_code,
+            "points": points,
+        },
+        headers={"Cache-Control": _REPORT_CACHE_CONTROL},
+    )
 
-    return TimeseriesResponse(
-        range=range,
-        start_date=start,
-        end_date=end,
-        network_code=network_code,
-        points=points,
+
+@app.get("/reports/timeseries.ndjson")
+async def get_timeseries_ndjson(
+    request: Request,
+    range: DateRange = Query(default=DateRange.last_7_days),
+    start_date: Optional[date] = Query(default=None),
+    end_date: Optional[date] = Query(default=None),
+    network_code: Optional[str] = Query(default=None),
+):
+    """
+    Daily timeseries streamed as NDJSON (one point per line), for large ranges.
+    """
+    start, end = _resolve_dates_or_400(range, start_date, end_date)
+    body = iter_timeseries_ndjson(start, end, network_code)
+    headers = {"Cache-Control": _REPORT_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = _gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        body,
+        media_type="application/x-ndjson",
+        headers=headers,
     )
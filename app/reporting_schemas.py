@@ -1,7 +1,7 @@
 # reporting_schemas.py
 from datetime import date, timedelta
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple, TypedDict
 from pydantic import BaseModel, Field
 
 
@@ -13,22 +13,25 @@ class DateRange(str, Enum):
     custom = "custom"
 
 
+# (days back for start, days back for end) relative to today
+_RANGE_OFFSETS: Dict[DateRange, Tuple[int, int]] = {
+    DateRange.today: (0, 0),
+    DateRange.yesterday: (1, 1),
+    DateRange.last_7_days: (6, 0),
+    DateRange.last_30_days: (29, 0),
+}
+
+
 def resolve_date_range(
     range_: DateRange,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
 ) -> tuple[date, date]:
-    today = date.today()
-
-    if range_ == DateRange.today:
-        return today, today
-    if range_ == DateRange.yesterday:
-        y = today - timedelta(days=1)
-        return y, y
-    if range_ == DateRange.last_7_days:
-        return today - timedelta(days=6), today
-    if range_ == DateRange.last_30_days:
-        return today - timedelta(days=29), today
+    offsets = _RANGE_OFFSETS.get(range_)
+    if offsets is not None:
+        today = date.today()
+        start_back, end_back = offsets
+        return today - timedelta(days=start_back), today - timedelta(days=end_back)
 
     # custom
     if not start_date or not end_date:
@@ -65,6 +68,28 @@ class TimeseriesPoint(BaseModel):
     ecpm: float
 
 
+# Plain-dict row shapes used by the report fetchers. Rows are generated
+# server-side, so they skip model construction and go straight to orjson;
+# the BaseModel versions above document the same shapes in OpenAPI.
+class LocationBreakdownItemDict(TypedDict):
+    country: str
+    region: Optional[str]
+    impressions: int
+    clicks: int
+    ctr: float
+    revenue: float
+    ecpm: float
+
+
+class TimeseriesPointDict(TypedDict):
+    date: date
+    impressions: int
+    clicks: int
+    ctr: float
+    revenue: float
+    ecpm: float
+
+
 class SummaryResponse(BaseModel):
     range: DateRange
     start_date: date
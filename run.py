@@ -17,9 +17,20 @@ import uvicorn
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))  # Render sets PORT env var
+    # GAM calls are blocking I/O, so run more workers than cores. cpu_count()
+    # reports host CPUs inside containers, and each worker has its own pools,
+    # caches and GAM_QPS rate limit, so cap the default; set WEB_CONCURRENCY
+    # to override.
+    default_workers = min(2 * (os.cpu_count() or 1), 4)
+    workers = int(os.getenv("WEB_CONCURRENCY", str(default_workers)))
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",      # must be 0.0.0.0 for Render
         port=port,
         reload=False,        # no reload in production
+        workers=workers,
+        loop="auto",         # uvloop when installed, asyncio otherwise
+        http="httptools",    # C HTTP parser
+        backlog=2048,
+        timeout_keep_alive=30,
     )